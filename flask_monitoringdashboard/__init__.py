@@ -48,6 +48,11 @@ def bind(app, schedule=True, include_dashboard=True):
         log("WARNING: You should provide a security key.")
         app.secret_key = "my-secret-key"
 
+    # Create the database tables, if needed
+    from flask_monitoringdashboard.database import init_db
+
+    init_db()
+
     # Add all route-functions to the blueprint
     if include_dashboard:
         from flask_monitoringdashboard.views import (
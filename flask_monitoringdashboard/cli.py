@@ -16,7 +16,8 @@ def fmd():
 @fmd.command()
 @with_appcontext
 def init_db():
-    # Importing the database package is enough
-    import flask_monitoringdashboard.database
+    from flask_monitoringdashboard.database import init_db
+
+    init_db()
 
     print('Flask-MonitoringDashboard database has been created')
@@ -4,7 +4,7 @@ from flask_monitoringdashboard.core.logger import log
 from flask_monitoringdashboard.core.colors import get_color
 from flask_monitoringdashboard.core.timezone import to_local_datetime
 from flask_monitoringdashboard.core.utils import simplify
-from flask_monitoringdashboard.database import row2dict
+from flask_monitoringdashboard.database import mapping2dict
 from flask_monitoringdashboard.database.outlier import get_outliers_cpus, get_outliers_sorted
 
 
@@ -33,12 +33,12 @@ def get_outlier_table(session, endpoint_id, offset, per_page):
     """
     table = get_outliers_sorted(session, endpoint_id, offset, per_page)
     for idx, row in enumerate(table):
-        row.request.time_requested = to_local_datetime(row.request.time_requested)
+        request = row.pop('request')
+        request['time_requested'] = to_local_datetime(request['time_requested'])
         try:
-            row.request_url = row.request_url.decode('utf-8')
+            row['request_url'] = row['request_url'].decode('utf-8')
         except Exception as e:
             log(e)
-        dict_request = row2dict(row.request)
-        table[idx] = row2dict(row)
-        table[idx]['request'] = dict_request
+        table[idx] = mapping2dict(row)
+        table[idx]['request'] = mapping2dict(request)
     return table
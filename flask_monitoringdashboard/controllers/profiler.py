@@ -4,7 +4,7 @@ import numpy
 
 from flask_monitoringdashboard.core.profiler.util import PathHash
 from flask_monitoringdashboard.core.timezone import to_local_datetime
-from flask_monitoringdashboard.database import row2dict
+from flask_monitoringdashboard.database import mapping2dict
 from flask_monitoringdashboard.database.stack_line import (
     get_profiled_requests,
     get_grouped_profiled_requests,
@@ -21,13 +21,14 @@ def get_profiler_table(session, endpoint_id, offset, per_page):
     table = get_profiled_requests(session, endpoint_id, offset, per_page)
 
     for idx, row in enumerate(table):
-        row.time_requested = to_local_datetime(row.time_requested)
-        table[idx] = row2dict(row)
+        row['time_requested'] = to_local_datetime(row['time_requested'])
         stack_lines = []
-        for line in row.stack_lines:
-            obj = row2dict(line)
-            obj['code'] = row2dict(line.code)
+        for line in row.pop('stack_lines'):
+            code = line.pop('code')
+            obj = mapping2dict(line)
+            obj['code'] = mapping2dict(code)
             stack_lines.append(obj)
+        table[idx] = mapping2dict(row)
         table[idx]['stack_lines'] = stack_lines
     return table
 
@@ -42,6 +42,7 @@ class Config(object):
         # database
         self.database_name = 'sqlite:///flask_monitoringdashboard.db'
         self.table_prefix = ''
+        self.pool_size = 5
 
         # authentication
         self.username = 'admin'
@@ -117,6 +118,8 @@ class Config(object):
                 result of each project is stored in its own database.
             - TABLE_PREFIX: A prefix to every table that the Flask-MonitoringDashboard uses, to
                 ensure that there are no conflicts with the user of the dashboard.
+            - POOL_SIZE: The number of connections that are kept open in the connection pool.
+                This is not used for SQLite databases. The default value is 5.
 
             The config_file must at least contains the following variables in section
             'visualization':
@@ -182,6 +185,7 @@ class Config(object):
             # database
             self.database_name = parse_string(parser, 'database', 'DATABASE', self.database_name)
             self.table_prefix = parse_string(parser, 'database', 'TABLE_PREFIX', self.table_prefix)
+            self.pool_size = parse_literal(parser, 'database', 'POOL_SIZE', self.pool_size)
 
             # visualization
             self.colors = parse_literal(parser, 'visualization', 'COLORS', self.colors)
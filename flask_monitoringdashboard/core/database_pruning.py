@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from flask_monitoringdashboard.core.custom_graph import scheduler
 from flask_monitoringdashboard.database import (
@@ -26,20 +27,16 @@ def prune_database_older_than_weeks(weeks_to_keep, delete_custom_graph_data):
         date_to_delete_from = datetime.utcnow() - timedelta(weeks=weeks_to_keep)
 
         # Prune Request table and related Outlier entries
-        requests_to_delete = (
-            session.query(Request)
-            .filter(Request.time_requested < date_to_delete_from)
-            .all()
+        requests_to_delete = select(Request.id).where(Request.time_requested < date_to_delete_from)
+
+        for table in (Outlier, StackLine, ExceptionOccurrence):
+            session.query(table).filter(table.request_id.in_(requests_to_delete)).delete(
+                synchronize_session=False
+            )
+        session.query(Request).filter(Request.time_requested < date_to_delete_from).delete(
+            synchronize_session=False
         )
 
-        for request in requests_to_delete:
-            session.query(Outlier).filter(Outlier.request_id == request.id).delete()
-            session.query(StackLine).filter(StackLine.request_id == request.id).delete()
-            session.query(ExceptionOccurrence).filter(
-                ExceptionOccurrence.request_id == request.id
-            ).delete()
-            session.delete(request)
-
         # Find and delete CodeLines not referenced by any StackLines
         session.query(CodeLine).filter(
             ~session.query(StackLine).filter(StackLine.code_id == CodeLine.id).exists()
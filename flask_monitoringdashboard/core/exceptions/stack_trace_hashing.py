@@ -1,4 +1,4 @@
-from flask_monitoringdashboard.core.exceptions.text_hash import text_hash
+from flask_monitoringdashboard.core.exceptions.text_hash import bytes_hash, text_hash
 
 import traceback
 from types import TracebackType
@@ -21,11 +21,11 @@ def hash_stack_trace(exc, tb):
     return _hash_traceback_type_object(stack_trace_hash, tb)
 
 
-def _hash_traceback_type_object(h: str, tb: Union[TracebackType, None]):
+def _hash_traceback_type_object(h: bytes, tb: Union[TracebackType, None]):
     if tb is None:
         return h
 
     f_def = get_function_definition_from_frame(tb.tb_frame)
-    new_hash = text_hash(h + f_def.code_hash)
+    new_hash = bytes_hash(h + f_def.code_hash)
 
     return _hash_traceback_type_object(new_hash, tb.tb_next)
@@ -1,5 +1,12 @@
 import hashlib
 
+DIGEST_SIZE = 16
+"""Size of a hash in bytes, which is plenty for telling stack traces and functions apart."""
 
-def text_hash(s: str):
-    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+
+def bytes_hash(b: bytes) -> bytes:
+    return hashlib.blake2b(b, digest_size=DIGEST_SIZE).digest()
+
+
+def text_hash(s: str) -> bytes:
+    return bytes_hash(s.encode("utf-8"))
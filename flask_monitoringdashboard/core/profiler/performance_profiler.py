@@ -3,6 +3,7 @@ from typing import Union
 from flask_monitoringdashboard import ExceptionCollector
 from flask_monitoringdashboard.core.cache import update_duration_cache
 from flask_monitoringdashboard.core.profiler.base_profiler import BaseProfiler
+from flask_monitoringdashboard.core.request_writer import enqueue_request
 from flask_monitoringdashboard.database import session_scope
 from flask_monitoringdashboard.database.request import add_request
 
@@ -34,6 +35,17 @@ class PerformanceProfiler(BaseProfiler):
         update_duration_cache(
             endpoint_name=self._endpoint.name, duration=self._duration
         )
+        if not self._has_exceptions():
+            # nothing refers to the request, so it can be written in a batch with other requests
+            enqueue_request(
+                duration=self._duration,
+                endpoint_id=self._endpoint.id,
+                ip=self._ip,
+                group_by=self._group_by,
+                status_code=self._status_code,
+            )
+            return
+
         with session_scope() as session:
             request_id = add_request(
                 session,
@@ -44,3 +56,8 @@ class PerformanceProfiler(BaseProfiler):
                 status_code=self._status_code,
             )
             self.e_collector.save_to_db(request_id, session)
+
+    def _has_exceptions(self):
+        return self.e_collector is not None and bool(
+            self.e_collector.user_captured_exceptions or self.e_collector.uncaught_exception
+        )
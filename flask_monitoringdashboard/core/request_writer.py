@@ -0,0 +1,92 @@
+"""
+    Writes the requests that are monitored with monitoring-level 1 in batches. Instead of
+    committing every request on its own, the requests are queued in memory and inserted
+    by a background thread.
+"""
+import atexit
+import datetime
+import queue
+import threading
+import time
+
+from flask_monitoringdashboard.database import Request, session_scope
+from flask_monitoringdashboard.database.ip import get_ip_id
+
+BATCH_SIZE = 500
+"""Maximum number of requests that are inserted at once."""
+
+FLUSH_INTERVAL = 0.1
+"""Maximum number of seconds that a request is kept in the queue."""
+
+_queue = queue.SimpleQueue()
+_write_lock = threading.Lock()
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def enqueue_request(duration, endpoint_id, ip, group_by, status_code):
+    """Queues a request for the background writer. The arguments are the same as for
+    add_request, but the id of the request is not available, since it's inserted later on.
+    """
+    _queue.put(
+        dict(
+            endpoint_id=endpoint_id,
+            duration=duration,
+            ip=ip,
+            group_by=group_by,
+            status_code=status_code,
+            time_requested=datetime.datetime.utcnow(),
+        )
+    )
+    _start_writer()
+
+
+def flush_requests():
+    """Writes all queued requests to the database. This is called before shutdown."""
+    batch = _drain(BATCH_SIZE, timeout=0)
+    while batch:
+        _write(batch)
+        batch = _drain(BATCH_SIZE, timeout=0)
+
+
+def _start_writer():
+    global _writer
+    if _writer is not None:
+        return
+    with _writer_lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_run, name='fmd-request-writer', daemon=True)
+            _writer.start()
+            atexit.register(flush_requests)
+
+
+def _run():
+    while True:
+        batch = _drain(BATCH_SIZE, timeout=FLUSH_INTERVAL)
+        if batch:
+            _write(batch)
+
+
+def _drain(max_size, timeout):
+    """Waits for the first request, and then collects requests until either max_size
+    requests are collected, or the timeout (in seconds) has passed.
+    """
+    try:
+        batch = [_queue.get(timeout=timeout) if timeout else _queue.get_nowait()]
+    except queue.Empty:
+        return []
+    deadline = time.monotonic() + timeout
+    while len(batch) < max_size:
+        remaining = deadline - time.monotonic()
+        try:
+            batch.append(_queue.get(timeout=remaining) if remaining > 0 else _queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def _write(batch):
+    with _write_lock, session_scope() as session:
+        for request in batch:
+            request['ip_id'] = get_ip_id(session, request.pop('ip'))
+        session.bulk_insert_mappings(Request, batch)
@@ -3,23 +3,35 @@ For information about how to access the database via a session-variable, see: se
 """
 
 import datetime
+import functools
+import logging
 import random
+import threading
 import time
 import uuid
 from contextlib import contextmanager
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
     Integer,
+    LargeBinary,
     String,
-    DateTime,
     create_engine,
+    event,
+    inspect,
     Float,
     TEXT,
     ForeignKey,
+    Index,
     exc,
+    select,
 )
+from sqlalchemy.dialects.mysql import BINARY
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.types import TypeDecorator
 
 try:
     # the declarative API is a part of the ORM layer since SQLAlchemy 1.4
@@ -27,13 +39,79 @@ try:
 except ImportError:
     # however it used to be an extension before SQLAlchemy 1.4
     from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship, scoped_session
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.orm import sessionmaker, relationship, scoped_session, column_property, backref
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from argon2.low_level import ARGON2_VERSION, verify_secret
+from werkzeug.security import check_password_hash
 
 from flask_monitoringdashboard import config
 
 Base = declarative_base()
 
+logger = logging.getLogger(__name__)
+
+password_hasher = PasswordHasher(time_cost=3, memory_cost=65536, parallelism=1)
+
+PASSWORD_HASH_PREFIX = "$argon2{}$v={}$m={},t={},p={}$".format(
+    password_hasher.type.name.lower(),
+    ARGON2_VERSION,
+    password_hasher.memory_cost,
+    password_hasher.time_cost,
+    password_hasher.parallelism,
+)
+"""Start of every hash that is created by password_hasher, e.g. '$argon2id$v=19$m=65536,t=3,p=1$'."""
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class EpochDateTime(TypeDecorator):
+    """Stores a (naive, UTC) datetime as the number of milliseconds since the epoch. Integers
+    are cheaper to compare and index than dates, and don't need parsing when they are loaded.
+    In Python the values are still datetime objects."""
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, int):
+            return value
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return (value - EPOCH) // datetime.timedelta(milliseconds=1)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return EPOCH + datetime.timedelta(milliseconds=value)
+
+
+class utc_epoch_ms(FunctionElement):
+    """The current time as the number of milliseconds since the epoch, computed by the database.
+    Used as server_default of EpochDateTime columns."""
+
+    type = BigInteger()
+    inherit_cache = True
+
+
+@compiles(utc_epoch_ms)
+def _utc_epoch_ms(element, compiler, **kw):
+    return "(CAST(EXTRACT(EPOCH FROM CURRENT_TIMESTAMP) * 1000 AS BIGINT))"
+
+
+@compiles(utc_epoch_ms, "sqlite")
+def _sqlite_utc_epoch_ms(element, compiler, **kw):
+    return "(CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER))"
+
+
+@compiles(utc_epoch_ms, "mysql", "mariadb")
+def _mysql_utc_epoch_ms(element, compiler, **kw):
+    return "(CAST(UNIX_TIMESTAMP(CURRENT_TIMESTAMP(3)) * 1000 AS SIGNED))"
+
+
+Digest = LargeBinary(16).with_variant(BINARY(16), "mysql", "mariadb")
+"""Raw 16-byte hash. MySQL can't put a unique index on a BLOB, so it uses a fixed-size BINARY."""
+
 
 class User(Base):
     """Table for storing user management."""
@@ -52,11 +130,30 @@ class User(Base):
     """False for guest permissions (only view access). True for admin permissions."""
 
     def set_password(self, password):
-        # Using the pbkdf2 because it scrypt won't work on a Mac M1 with Sequoia
-        self.password_hash = generate_password_hash(password, "pbkdf2")
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """Verifies the password. The prefix of the hash tells whether it was created with the
+        current parameters, in which case it is verified directly (in constant time). Hashes
+        created with other parameters, or by older versions (Werkzeug's pbkdf2), are still
+        accepted, and are replaced by a new hash when the password is correct."""
+        if self.password_hash.startswith(PASSWORD_HASH_PREFIX):
+            try:
+                return verify_secret(
+                    self.password_hash.encode(), password.encode(), password_hasher.type
+                )
+            except (InvalidHashError, VerificationError):
+                return False
+
+        if self.password_hash.startswith("$argon2"):
+            try:
+                password_hasher.verify(self.password_hash, password)
+            except (InvalidHashError, VerificationError):
+                return False
+        elif not check_password_hash(self.password_hash, password):
+            return False
+        self.set_password(password)
+        return True
 
 
 class TelemetryUser(Base):
@@ -64,13 +161,13 @@ class TelemetryUser(Base):
 
     __tablename__ = "{}TelemetryUser".format(config.table_prefix)
 
-    id = Column(String(40), primary_key=True, default=str(uuid.uuid4()))
+    id = Column(String(40), primary_key=True, default=lambda: str(uuid.uuid4()))
     """Unique anonymous identifier to group the data received through telemetry"""
 
     times_initialized = Column(Integer, default=1)
     """For checking the amount of times the app was initialized"""
 
-    last_initialized = Column(DateTime, default=datetime.datetime.utcnow)
+    last_initialized = Column(EpochDateTime, default=datetime.datetime.utcnow)
     """Check when was the last time user accessed FMD"""
 
     monitoring_consent = Column(Integer, default=1)
@@ -90,16 +187,27 @@ class Endpoint(Base):
     monitor_level = Column(Integer, default=config.monitor_level)
     """0 - disabled, 1 - performance, 2 - outliers, 3 - profiler + outliers"""
 
-    time_added = Column(DateTime, default=datetime.datetime.utcnow)
+    time_added = Column(EpochDateTime, default=datetime.datetime.utcnow)
     """Time when the endpoint was added."""
 
     version_added = Column(String(100), default=config.version)
     """Version when the endpoint was added into the DB."""
 
-    last_requested = Column(DateTime)
+    last_requested = Column(EpochDateTime)
     """Time when the endpoint was last requested."""
 
 
+class IP(Base):
+    """Table for storing the distinct IP addresses of requesters."""
+
+    __tablename__ = "{}IP".format(config.table_prefix)
+
+    id = Column(Integer, primary_key=True)
+
+    address = Column(String(100), unique=True, nullable=False)
+    """IP address of the requester."""
+
+
 class Request(Base):
     """Table for storing measurements of requests."""
 
@@ -108,29 +216,38 @@ class Request(Base):
     id = Column(Integer, primary_key=True)
 
     endpoint_id = Column(Integer, ForeignKey(Endpoint.id))
-    endpoint = relationship(Endpoint, backref="requests")
+    # lazy="raise": an endpoint can have millions of requests, so they must be queried explicitly
+    endpoint = relationship(Endpoint, backref=backref("requests", lazy="raise"))
     """The endpoint that handles the request."""
 
     duration = Column(Float, nullable=False)
     """Processing time of the request in milliseconds."""
 
-    time_requested = Column(DateTime, default=datetime.datetime.utcnow)
+    time_requested = Column(EpochDateTime, server_default=utc_epoch_ms())
     """Moment when the request was handled."""
 
+    # not a server_default: that is fixed when the table is created, but the version isn't
     version_requested = Column(String(100), default=config.version)
     """Version when the request was handled."""
 
-    group_by = Column(String(100), default=None)
+    group_by = Column(String(100))
     """Criteria which can be used for grouping multiple requests."""
 
-    ip = Column(String(100), nullable=False)
-    """IP address of the requester."""
+    ip_id = Column(Integer, ForeignKey(IP.id), nullable=False)
+    ip = column_property(select(IP.address).where(IP.id == ip_id).scalar_subquery())
+    """IP address of the requester (read-only, use ip_id to set it)."""
 
     status_code = Column(Integer, nullable=True)
     """HTTP status code of the request."""
 
     outlier = relationship("Outlier", uselist=False, back_populates="request")
 
+    __table_args__ = (
+        Index("{}ix_req_endpoint_time".format(config.table_prefix), endpoint_id, time_requested),
+        Index("{}ix_req_time".format(config.table_prefix), time_requested),
+        Index("{}ix_req_status_time".format(config.table_prefix), status_code, time_requested),
+    )
+
 
 class Outlier(Base):
     """Table for storing information about outliers."""
@@ -190,7 +307,7 @@ class StackLine(Base):
     __tablename__ = "{}StackLine".format(config.table_prefix)
 
     request_id = Column(Integer, ForeignKey(Request.id), primary_key=True)
-    request = relationship(Request, backref="stack_lines")
+    request = relationship(Request, backref=backref("stack_lines", lazy="raise"))
     """Request that belongs to this stack_line."""
 
     code_id = Column(Integer, ForeignKey(CodeLine.id))
@@ -217,7 +334,7 @@ class CustomGraph(Base):
     title = Column(String(250), nullable=False, unique=True)
     """Title of this graph."""
 
-    time_added = Column(DateTime, default=datetime.datetime.utcnow)
+    time_added = Column(EpochDateTime, default=datetime.datetime.utcnow)
     """When the graph was first added to the dashboard."""
 
     version_added = Column(String(100), default=config.version)
@@ -232,15 +349,17 @@ class CustomGraphData(Base):
     id = Column(Integer, primary_key=True)
 
     graph_id = Column(Integer, ForeignKey(CustomGraph.graph_id))
-    graph = relationship(CustomGraph, backref="data")
+    graph = relationship(CustomGraph, backref=backref("data", lazy="raise"))
     """Graph for which the data is collected."""
 
-    time = Column(DateTime, default=datetime.datetime.utcnow)
+    time = Column(EpochDateTime, default=datetime.datetime.utcnow)
     """Moment when the data is collected."""
 
     value = Column(Float)
     """Actual value that is measured."""
 
+    __table_args__ = (Index("{}ix_cgd_graph_time".format(config.table_prefix), graph_id, time),)
+
 
 class StackTraceSnapshot(Base):
     """Table for storing a hash of a stack trace and its related functions, to avoid 'duplicate' ExceptionStackLines."""
@@ -248,7 +367,8 @@ class StackTraceSnapshot(Base):
     __tablename__ = "{}StackTraceSnapshot".format(config.table_prefix)
 
     id = Column(Integer, primary_key=True)
-    hash = Column(String(64), nullable=False, unique=True)
+    hash = Column(Digest, nullable=False, unique=True)
+    """The 16-byte BLAKE2b hash of the stack trace."""
 
     exception_stack_lines = relationship(
         "ExceptionStackLine", back_populates="stack_trace_snapshot"
@@ -296,6 +416,8 @@ class ExceptionOccurrence(Base):
 
     is_user_captured = Column(Boolean, nullable=False)
 
+    __table_args__ = (Index("{}ix_exc_occ_req".format(config.table_prefix), request_id),)
+
 
 class FunctionDefinition(Base):
     """Table for storing entire functions for better logging"""
@@ -310,8 +432,8 @@ class FunctionDefinition(Base):
     code = Column(TEXT, nullable=True)
     """The entire function code"""
 
-    code_hash = Column(String(64), nullable=True)
-    """The hash of the function code"""
+    code_hash = Column(Digest, nullable=True)
+    """The 16-byte BLAKE2b hash of the function code"""
 
 
 class FilePath(Base):
@@ -380,11 +502,66 @@ class ExceptionStackLine(Base):
     """Position in the flattened stack tree."""
 
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Switches every new SQLite connection to write-ahead logging. Together with
+    synchronous=NORMAL, a commit no longer needs an fsync, and readers don't block the writer.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+
+def create_database_engine(database_name):
+    """Creates the engine for the given database url. SQLite uses the SQLAlchemy defaults, as
+    it does not benefit from a connection pool, but its connections are tuned for frequent
+    writes; other databases get a pool that survives bursts of requests and stale connections.
+    :param database_name: url of the database
+    :return: the SQLAlchemy engine
+    """
+    if database_name.startswith("sqlite"):
+        sqlite_engine = create_engine(database_name)
+        event.listen(sqlite_engine, "connect", _set_sqlite_pragmas)
+        return sqlite_engine
+    return create_engine(
+        database_name,
+        pool_size=config.pool_size,
+        max_overflow=-1,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+    )
+
+
 # define the database
-engine = create_engine(config.database_name)
-Base.metadata.create_all(engine)
+engine = create_database_engine(config.database_name)
 Base.metadata.bind = engine
 DBSession = sessionmaker(bind=engine)
+Session = scoped_session(DBSession)
+
+COMMIT_RETRIES = 3
+"""Number of times a commit is retried when the database is (temporarily) unavailable."""
+
+_db_initialized = False
+_db_lock = threading.Lock()
+
+
+def init_db():
+    """Creates the tables that do not exist yet. This is done only once per process, and
+    create_all is skipped entirely when all tables are already present.
+    It is called by bind() and session_scope(), so usually there is no need to call it yourself.
+    """
+    global _db_initialized
+    if _db_initialized:
+        return
+    with _db_lock:
+        if _db_initialized:
+            return
+        existing_tables = set(inspect(engine).get_table_names())
+        if not all(table.name in existing_tables for table in Base.metadata.sorted_tables):
+            Base.metadata.create_all(engine, checkfirst=True)
+        _db_initialized = True
 
 
 @contextmanager
@@ -392,23 +569,80 @@ def session_scope():
     """When accessing the database, use the following syntax:
     >>> with session_scope() as session:
     >>>     session.query(...)
+    Nested scopes within the same thread share the thread-local session; only the
+    outermost scope removes it from the registry.
     :return: the session for accessing the database.
     """
-    session_obj = scoped_session(DBSession)
-    session = session_obj()
+    init_db()
+    nested = Session.registry.has()
+    session = Session()
     try:
         yield session
         session.commit()
     except exc.OperationalError as e:
-        print("Will retry commit, due to the following error: {}".format(e))
-        session.rollback()
-        time.sleep(0.5 + random.random())
-        session.commit()
+        for attempt in range(COMMIT_RETRIES):
+            logger.warning("Will retry commit, due to the following error: %s", e)
+            session.rollback()
+            # exponential backoff with jitter: ~10ms, ~40ms, ~160ms
+            time.sleep(0.01 * 4 ** attempt + random.random() * 0.01)
+            try:
+                session.commit()
+                break
+            except exc.OperationalError as retry_error:
+                e = retry_error
+        else:
+            session.rollback()
+            logger.error("No commit has been made, due to the following error: %s", e)
     except Exception as e:
         session.rollback()
-        print("No commit has been made, due to the following error: {}".format(e))
+        logger.exception("No commit has been made, due to the following error: %s", e)
     finally:
-        session.close()
+        if not nested:
+            Session.remove()
+
+
+FOREIGN_KEY_CHECKS = {
+    "sqlite": ("PRAGMA foreign_keys", "PRAGMA foreign_keys={}"),
+    "mysql": ("SELECT @@FOREIGN_KEY_CHECKS", "SET FOREIGN_KEY_CHECKS={}"),
+}
+"""Statements that query and set whether foreign keys are checked, per dialect."""
+
+
+@contextmanager
+def bulk_load(bind=None):
+    """Use this for loading a lot of rows at once, e.g. in migrations or tests:
+    >>> with bulk_load() as connection:
+    >>>     connection.execute(Request.__table__.insert(), rows)
+    The foreign keys are not checked for every row, so the rows can be inserted in any order.
+    Everything is inserted in a single transaction, after which the checks are restored.
+    :param bind: the engine to load the rows into, defaults to the engine of the dashboard
+    :return: the connection for loading the rows.
+    """
+    bind = engine if bind is None else bind
+    get_checks, set_checks = FOREIGN_KEY_CHECKS.get(bind.dialect.name, (None, None))
+    with bind.connect() as connection:
+        # SQLite ignores the pragma within a transaction, so it is set before and after it
+        if get_checks:
+            checks = connection.exec_driver_sql(get_checks).scalar()
+            connection.exec_driver_sql(set_checks.format(0))
+            connection.commit()
+        try:
+            with connection.begin():
+                yield connection
+        finally:
+            if get_checks:
+                connection.exec_driver_sql(set_checks.format(checks))
+                connection.commit()
+
+
+@functools.lru_cache(maxsize=None)
+def _column_names(cls):
+    """Returns the column attributes of a mapped class, computed once per class."""
+    return tuple(attribute.key for attribute in inspect(cls).column_attrs)
+
+
+def _to_str(value):
+    return value if type(value) is str else str(value)
 
 
 def row2dict(row):
@@ -418,29 +652,48 @@ def row2dict(row):
     :param row: any object
     :return: dict
     """
-    d = {}
-    for column in row.__table__.columns:
-        d[column.name] = str(getattr(row, column.name))
+    return {name: _to_str(getattr(row, name)) for name in _column_names(type(row))}
 
-    return d
+
+def mapping2dict(mapping):
+    """Converts a dict (e.g. one returned by rows_to_dicts) in the same way as row2dict does.
+    :param mapping: any mapping
+    :return: dict
+    """
+    return {key: _to_str(value) for key, value in mapping.items()}
+
+
+def rows_to_dicts(session, statement):
+    """Executes a Core select-statement and returns every row as a python dict.
+    This bypasses the ORM, so no objects are constructed or added to the identity map.
+    :param session: session for the database
+    :param statement: the select-statement to execute
+    :return: list of dicts
+    """
+    return [dict(row._mapping) for row in session.execute(statement)]
+
+
+TABLES = (
+    Endpoint,
+    IP,
+    Request,
+    Outlier,
+    StackLine,
+    CodeLine,
+    CustomGraph,
+    CustomGraphData,
+    StackTraceSnapshot,
+    ExceptionType,
+    ExceptionMessage,
+    ExceptionOccurrence,
+    FunctionDefinition,
+    ExceptionStackLine,
+    FilePath,
+    FunctionLocation,
+    ExceptionFrame,
+)
+"""The tables with monitoring data, i.e. all tables except for the user tables."""
 
 
 def get_tables():
-    return [
-        Endpoint,
-        Request,
-        Outlier,
-        StackLine,
-        CodeLine,
-        CustomGraph,
-        CustomGraphData,
-        StackTraceSnapshot,
-        ExceptionType,
-        ExceptionMessage,
-        ExceptionOccurrence,
-        FunctionDefinition,
-        ExceptionStackLine,
-        FilePath,
-        FunctionLocation,
-        ExceptionFrame,
-    ]
+    return TABLES
@@ -15,6 +15,7 @@ def get_user(username, password):
         user = session.query(User).filter(User.username == username).one_or_none()
         if user is not None:
             if user.check_password(password=password):
+                session.flush()  # store the password hash, in case it has been upgraded
                 session.expunge_all()
                 return user
 
@@ -8,7 +8,7 @@ from sqlalchemy import func, desc
 from sqlalchemy.orm.exc import NoResultFound
 
 from flask_monitoringdashboard.core.timezone import to_local_datetime
-from flask_monitoringdashboard.database import Request, Endpoint
+from flask_monitoringdashboard.database import Request, Endpoint, IP
 
 
 def get_num_requests(session, endpoint_id, start_date, end_date):
@@ -75,10 +75,11 @@ def get_ips(session, endpoint_id, limit=None):
     :return a list with the group_by as strings.
     """
     query = (
-        session.query(Request.ip, func.count(Request.ip))
+        session.query(IP.address, func.count(Request.ip_id))
+        .join(Request, Request.ip_id == IP.id)
         .filter(Request.endpoint_id == endpoint_id)
-        .group_by(Request.ip)
-        .order_by(desc(func.count(Request.ip)))
+        .group_by(IP.address)
+        .order_by(desc(func.count(Request.ip_id)))
     )
     if limit:
         query = query.limit(limit)
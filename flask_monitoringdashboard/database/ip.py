@@ -0,0 +1,44 @@
+"""
+Contains all functions that access an IP object.
+"""
+import threading
+from collections import OrderedDict
+
+from flask_monitoringdashboard.database import IP
+
+IP_CACHE_SIZE = 1024
+"""Maximum number of IP addresses for which the id is cached."""
+
+_ip_cache = OrderedDict()
+_ip_cache_lock = threading.Lock()
+
+
+def get_ip_id(session, address):
+    """
+    Returns the id of the given IP address. If the address doesn't exist yet, it is added to the
+    database. The ids of the most recently used addresses are cached in memory, so that frequent
+    requesters don't cost a database round-trip.
+    :param session: session for the database
+    :param address: IP address (string)
+    :return: the id of the IP address
+    """
+    address = address[:100]  # To avoid error if larger than allowed in db
+    with _ip_cache_lock:
+        ip_id = _ip_cache.get(address)
+        if ip_id is not None:
+            _ip_cache.move_to_end(address)
+            return ip_id
+
+    ip = session.query(IP).filter(IP.address == address).first()
+    if ip is None:
+        # Only cache ids that are already committed, in case this transaction is rolled back
+        ip = IP(address=address)
+        session.add(ip)
+        session.flush()
+        return ip.id
+
+    with _ip_cache_lock:
+        _ip_cache[address] = ip.id
+        if len(_ip_cache) > IP_CACHE_SIZE:
+            _ip_cache.popitem(last=False)
+    return ip.id
@@ -1,7 +1,6 @@
-from sqlalchemy import desc
-from sqlalchemy.orm import joinedload
+from sqlalchemy import desc, select
 
-from flask_monitoringdashboard.database import Outlier, Request
+from flask_monitoringdashboard.database import Outlier, Request, rows_to_dicts
 
 
 def add_outlier(session, request_id, cpu_percent, memory, stacktrace, request):
@@ -29,25 +28,33 @@ def add_outlier(session, request_id, cpu_percent, memory, stacktrace, request):
 
 def get_outliers_sorted(session, endpoint_id, offset, per_page):
     """
-    Gets a list of Outlier objects for a certain endpoint, sorted by most recent request time
+    Gets the outliers of a certain endpoint, sorted by most recent request time
     :param session: session for the database
     :param endpoint_id: id of the endpoint for filtering the requests
     :param offset: number of items to skip
     :param per_page: number of items to return
-    :return list of Outlier objects of a specific endpoint
+    :return list of dicts with the columns of an outlier. The columns of the corresponding request
+    are stored under the key 'request'.
     """
-    result = (
-        session.query(Outlier)
-        .join(Outlier.request)
-        .options(joinedload(Outlier.request).joinedload(Request.endpoint))
-        .filter(Request.endpoint_id == endpoint_id)
+    outliers = rows_to_dicts(
+        session,
+        select(Outlier.__table__)
+        .join(Request.__table__, Outlier.request_id == Request.id)
+        .where(Request.endpoint_id == endpoint_id)
         .order_by(desc(Request.time_requested))
         .offset(offset)
-        .limit(per_page)
-        .all()
+        .limit(per_page),
     )
-    session.expunge_all()
-    return result
+    request_ids = [outlier['request_id'] for outlier in outliers]
+    requests = {
+        request['id']: request
+        for request in rows_to_dicts(
+            session, select(Request.__table__, Request.ip).where(Request.id.in_(request_ids))
+        )
+    }
+    for outlier in outliers:
+        outlier['request'] = requests[outlier['request_id']]
+    return outliers
 
 
 def get_outliers_cpus(session, endpoint_id):
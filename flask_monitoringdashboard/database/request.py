@@ -6,6 +6,7 @@ import time
 from sqlalchemy import and_, func
 
 from flask_monitoringdashboard.database import Request
+from flask_monitoringdashboard.database.ip import get_ip_id
 
 
 def get_latencies_sample(session, endpoint_id, criterion, sample_size=500):
@@ -39,7 +40,7 @@ def add_request(session, duration, endpoint_id, ip, group_by, status_code):
     request = Request(
         endpoint_id=endpoint_id,
         duration=duration,
-        ip=ip,
+        ip_id=get_ip_id(session, ip),
         group_by=group_by,
         status_code=status_code,
     )
@@ -2,10 +2,10 @@
 Contains all functions that access an StackLine object.
 """
 
-from sqlalchemy import desc, distinct
-from sqlalchemy.orm import joinedload
+from sqlalchemy import desc, distinct, select
+from sqlalchemy.orm import selectinload
 
-from flask_monitoringdashboard.database import StackLine, Request
+from flask_monitoringdashboard.database import StackLine, Request, CodeLine, rows_to_dicts
 from flask_monitoringdashboard.database.code_line import get_code_line
 
 
@@ -39,21 +39,44 @@ def get_profiled_requests(session, endpoint_id, offset, per_page):
     :param endpoint_id: filter profiled requests on this endpoint
     :param offset: number of items to skip
     :param per_page: number of items to return
-    :return: A list with tuples. Each tuple consists first of a Request-object, and the second part
-    of the tuple is a list of StackLine-objects.
+    :return: A list with dicts. Each dict contains the columns of a request, and the key
+    'stack_lines' with a list of dicts of its stack lines. The columns of the corresponding
+    code line are stored under the key 'code' of each stack line.
     """
-    result = (
-        session.query(Request)
-        .filter(Request.endpoint_id == endpoint_id)
-        .options(joinedload(Request.stack_lines).joinedload(StackLine.code))
-        .filter(Request.stack_lines.any())
+    requests = rows_to_dicts(
+        session,
+        select(Request.__table__, Request.ip)
+        .where(Request.endpoint_id == endpoint_id, Request.stack_lines.any())
         .order_by(desc(Request.time_requested))
         .offset(offset)
-        .limit(per_page)
-        .all()
+        .limit(per_page),
     )
-    session.expunge_all()
-    return result
+    if not requests:
+        return requests
+
+    stack_lines = rows_to_dicts(
+        session,
+        select(StackLine.__table__)
+        .where(StackLine.request_id.in_([request['id'] for request in requests]))
+        .order_by(StackLine.request_id, StackLine.position),
+    )
+    code_lines = {
+        code_line['id']: code_line
+        for code_line in rows_to_dicts(
+            session,
+            select(CodeLine.__table__).where(
+                CodeLine.id.in_({stack_line['code_id'] for stack_line in stack_lines})
+            ),
+        )
+    }
+
+    lines_per_request = {request['id']: [] for request in requests}
+    for stack_line in stack_lines:
+        stack_line['code'] = code_lines.get(stack_line['code_id'])
+        lines_per_request[stack_line['request_id']].append(stack_line)
+    for request in requests:
+        request['stack_lines'] = lines_per_request[request['id']]
+    return requests
 
 
 def get_grouped_profiled_requests(session, endpoint_id):
@@ -79,7 +102,7 @@ def get_grouped_profiled_requests(session, endpoint_id):
         .join(Request.stack_lines)
         .filter(Request.id == t.c.id)
         .order_by(desc(Request.id))
-        .options(joinedload(Request.stack_lines).joinedload(StackLine.code))
+        .options(selectinload(Request.stack_lines).selectinload(StackLine.code))
         .all()
     )
     session.expunge_all()
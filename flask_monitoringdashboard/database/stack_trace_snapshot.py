@@ -5,7 +5,7 @@ from sqlalchemy import desc
 
 
 def get_stack_trace_by_hash(
-    session: Session, stack_trace_snapshot_hash: str
+    session: Session, stack_trace_snapshot_hash: bytes
 ) -> Union[StackTraceSnapshot, None]:
     """
     Get StackTraceSnapshot record by its hash.
@@ -18,7 +18,7 @@ def get_stack_trace_by_hash(
     return result
 
 
-def add_stack_trace_snapshot(session: Session, stack_trace_snapshot_hash: str) -> int:
+def add_stack_trace_snapshot(session: Session, stack_trace_snapshot_hash: bytes) -> int:
     """
     Add a new StackTraceSnapshot record. Returns the id.
     """
@@ -2,7 +2,13 @@ import pytest
 from factory.alchemy import SQLAlchemyModelFactory
 from sqlalchemy.orm import scoped_session
 
-from flask_monitoringdashboard.database import DBSession
+from flask_monitoringdashboard.database import DBSession, init_db
+
+
+@pytest.fixture(scope='session', autouse=True)
+def database():
+    """Creates the database tables."""
+    init_db()
 
 
 @pytest.fixture
@@ -29,6 +29,7 @@ from flask_monitoringdashboard.database import (
     FunctionLocation,
     ExceptionFrame,
 )
+from flask_monitoringdashboard.database.ip import get_ip_id
 from tests.fixtures.database import ModelFactory
 
 
@@ -75,6 +76,15 @@ class RequestFactory(ModelFactory):
     ip = factory.Faker("ipv4_private")
     status_code = 200
 
+    @classmethod
+    def _create(cls, model_class, ip=None, *args, **kwargs):
+        """Override _create, because the ip is stored in a separate table"""
+        session = cls._meta.sqlalchemy_session
+        instance = model_class(ip_id=get_ip_id(session, ip), **kwargs)
+        session.add(instance)
+        session.commit()
+        return instance
+
 
 class OutlierFactory(ModelFactory):
     class Meta:
@@ -181,7 +191,7 @@ class FunctionDefinitionFactory(ModelFactory):
         model = FunctionDefinition
 
     code = "def fun(): return 0"
-    code_hash = factory.LazyFunction(lambda: str(uuid.uuid4()))
+    code_hash = factory.LazyFunction(lambda: uuid.uuid4().bytes)
     name = "fun"
 
 class FunctionLocationFactory(ModelFactory):
@@ -203,7 +213,7 @@ class StackTraceSnapshotFactory(ModelFactory):
     class Meta:
         model = StackTraceSnapshot
 
-    hash = factory.LazyFunction(lambda: str(uuid.uuid4()))
+    hash = factory.LazyFunction(lambda: uuid.uuid4().bytes)
 
 class ExceptionStackLineFactory(ModelFactory):
     class Meta:
@@ -0,0 +1,19 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from flask_monitoringdashboard.core.database_pruning import prune_database_older_than_weeks
+from flask_monitoringdashboard.database import Outlier, Request, StackLine
+
+
+@pytest.mark.usefixtures('outlier_1', 'stack_line', 'request_2')
+@pytest.mark.parametrize('request_1__time_requested', [datetime.utcnow() - timedelta(weeks=3)])
+def test_prune_database_older_than_weeks(session, request_1, request_2):
+    request_1_id, request_2_id = request_1.id, request_2.id
+    prune_database_older_than_weeks(weeks_to_keep=2, delete_custom_graph_data=False)
+    session.expire_all()
+
+    assert session.get(Request, request_1_id) is None
+    assert session.get(Request, request_2_id) is not None
+    assert session.query(Outlier).filter(Outlier.request_id == request_1_id).count() == 0
+    assert session.query(StackLine).filter(StackLine.request_id == request_1_id).count() == 0
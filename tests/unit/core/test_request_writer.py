@@ -0,0 +1,24 @@
+from flask_monitoringdashboard.core import request_writer
+from flask_monitoringdashboard.database import Request
+
+
+def test_flush_requests(monkeypatch, session, endpoint):
+    monkeypatch.setattr(request_writer, '_start_writer', lambda: None)
+    for status_code in (200, 500):
+        request_writer.enqueue_request(
+            duration=10, endpoint_id=endpoint.id, ip='127.0.0.1', group_by=None, status_code=status_code
+        )
+    request_writer.flush_requests()
+
+    requests = session.query(Request).filter(Request.endpoint_id == endpoint.id).all()
+    assert sorted(request.status_code for request in requests) == [200, 500]
+    assert all(request.ip == '127.0.0.1' and request.time_requested for request in requests)
+
+
+def test_drain_respects_batch_size(monkeypatch):
+    monkeypatch.setattr(request_writer, '_queue', request_writer.queue.SimpleQueue())
+    for i in range(5):
+        request_writer._queue.put(i)
+    assert request_writer._drain(3, timeout=0) == [0, 1, 2]
+    assert request_writer._drain(3, timeout=0) == [3, 4]
+    assert request_writer._drain(3, timeout=0) == []
@@ -0,0 +1,21 @@
+from flask_monitoringdashboard.core.exceptions.stack_trace_hashing import hash_stack_trace
+from flask_monitoringdashboard.core.exceptions.text_hash import DIGEST_SIZE
+
+
+def raise_exception():
+    raise ValueError('test')
+
+
+def catch_exception():
+    try:
+        raise_exception()
+    except ValueError as e:
+        return e
+
+
+def test_hash_stack_trace():
+    e1, e2 = catch_exception(), catch_exception()
+    stack_trace_hash = hash_stack_trace(e1, e1.__traceback__)
+    assert isinstance(stack_trace_hash, bytes)
+    assert len(stack_trace_hash) == DIGEST_SIZE
+    assert stack_trace_hash == hash_stack_trace(e2, e2.__traceback__)
@@ -1,4 +1,7 @@
-from flask_monitoringdashboard.database import User
+from argon2 import PasswordHasher
+from werkzeug.security import generate_password_hash
+
+from flask_monitoringdashboard.database import PASSWORD_HASH_PREFIX, User
 from flask_monitoringdashboard.database.auth import get_user
 
 
@@ -16,3 +19,26 @@ def test_get_user_adds_default(session, config):
 def test_get_user_returns_none(user):
     """Test that get_user returns None if the user cannot be found."""
     assert get_user(username=user.username, password='1234') is None
+
+
+def test_check_password_upgrades_legacy_hash():
+    user = User(username='legacy')
+    user.password_hash = generate_password_hash('password', 'pbkdf2')
+
+    assert not user.check_password('wrong')
+    assert user.password_hash.startswith('pbkdf2')
+    assert user.check_password('password')
+    assert user.password_hash.startswith('$argon2id$')
+    assert user.check_password('password')
+
+
+def test_check_password_upgrades_hash_parameters():
+    user = User(username='argon2')
+    user.password_hash = PasswordHasher(time_cost=1, memory_cost=8, parallelism=1).hash('password')
+
+    assert not user.check_password('wrong')
+    assert not user.password_hash.startswith(PASSWORD_HASH_PREFIX)
+    assert user.check_password('password')
+    assert user.password_hash.startswith(PASSWORD_HASH_PREFIX)
+    assert user.check_password('password')
+    assert not user.check_password('wrong')
@@ -0,0 +1,103 @@
+"""
+This file contains all unit tests for the database module itself.
+(Corresponding to the file: 'flask_monitoringdashboard/database/__init__.py')
+"""
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.orm import Session as SASession
+
+from flask_monitoringdashboard.database import (
+    COMMIT_RETRIES,
+    IP,
+    Request,
+    TelemetryUser,
+    bulk_load,
+    row2dict,
+    session_scope,
+)
+
+
+def test_row2dict(request_1):
+    data = row2dict(request_1)
+    assert set(data) == {column.name for column in Request.__table__.columns} | {'ip'}
+    assert data['ip'] == request_1.ip
+    assert data['id'] == str(request_1.id)
+    assert data['duration'] == str(request_1.duration)
+    assert data['group_by'] == 'None'
+    assert data['time_requested'] == str(request_1.time_requested)
+
+
+def test_telemetry_user_id_is_unique(session):
+    users = [TelemetryUser(), TelemetryUser()]
+    session.add_all(users)
+    session.flush()
+    assert users[0].id != users[1].id
+    session.rollback()
+
+
+def test_session_scope_retries_commit(monkeypatch):
+    commits = []
+
+    def commit(self):
+        commits.append(self)
+        if len(commits) < 3:
+            raise exc.OperationalError('COMMIT', {}, Exception('database is locked'))
+
+    monkeypatch.setattr(SASession, 'commit', commit)
+    monkeypatch.setattr(time, 'sleep', lambda seconds: None)
+    with session_scope():
+        pass
+    assert len(commits) == 3
+
+
+def test_session_scope_stops_retrying(monkeypatch):
+    commits = []
+
+    def commit(self):
+        commits.append(self)
+        raise exc.OperationalError('COMMIT', {}, Exception('database is locked'))
+
+    monkeypatch.setattr(SASession, 'commit', commit)
+    monkeypatch.setattr(time, 'sleep', lambda seconds: None)
+    with session_scope():
+        pass
+    assert len(commits) == COMMIT_RETRIES + 1
+
+
+@pytest.mark.parametrize('request_1__time_requested', [datetime(2020, 1, 2, 3, 4, 5, 678000)])
+def test_epoch_datetime(session, request_1):
+    stored = session.execute(
+        text('SELECT time_requested FROM {} WHERE id = :id'.format(Request.__tablename__)),
+        {'id': request_1.id},
+    ).scalar()
+    assert stored == 1577934245678
+    assert session.get(Request, request_1.id).time_requested == datetime(2020, 1, 2, 3, 4, 5, 678000)
+    assert session.query(Request).filter(Request.time_requested >= datetime(2020, 1, 2)).count()
+
+
+def test_sqlite_pragmas(session):
+    if session.get_bind().dialect.name != 'sqlite':
+        pytest.skip('The pragmas only apply to SQLite')
+    assert session.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+    assert session.execute(text('PRAGMA synchronous')).scalar() == 1  # NORMAL
+
+
+def test_bulk_load(session, endpoint):
+    ip_id = session.execute(text('SELECT MAX(id) FROM {}'.format(IP.__tablename__))).scalar() or 0
+    rows = [
+        # the request refers to an IP address that is only inserted afterwards
+        {'endpoint_id': endpoint.id, 'duration': 1, 'ip_id': ip_id + 1, 'time_requested': datetime.utcnow()},
+    ]
+    with bulk_load() as connection:
+        connection.execute(Request.__table__.insert(), rows)
+        connection.execute(IP.__table__.insert(), [{'id': ip_id + 1, 'address': 'bulk-load'}])
+
+    assert session.query(Request).filter(Request.ip == 'bulk-load').count() == 1
+
+
+def test_backrefs_raise(endpoint):
+    with pytest.raises(exc.InvalidRequestError):
+        endpoint.requests
@@ -0,0 +1,23 @@
+"""
+This file contains all unit tests for the IP-table in the database. (Corresponding to the
+file: 'flask_monitoringdashboard/database/ip.py')
+"""
+import uuid
+
+from flask_monitoringdashboard.database import IP
+from flask_monitoringdashboard.database.ip import get_ip_id
+
+
+def test_get_ip_id(session):
+    address = str(uuid.uuid4())
+    ip_id = get_ip_id(session, address)
+    session.commit()
+
+    assert session.query(IP).filter(IP.address == address).one().id == ip_id
+    assert get_ip_id(session, address) == ip_id
+    assert get_ip_id(session, address) == ip_id  # cached
+    assert session.query(IP).filter(IP.address == address).count() == 1
+
+
+def test_request_ip(session, request_1):
+    assert session.get(IP, request_1.ip_id).address == request_1.ip
@@ -28,7 +28,7 @@ def test_add_outlier(session, request_1):
 def test_get_outliers(session, outlier_1, endpoint):
     outliers = get_outliers_sorted(session, endpoint_id=endpoint.id, offset=0, per_page=10)
     assert len(outliers) == 1
-    assert outliers[0].id == outlier_1.id
+    assert outliers[0]['id'] == outlier_1.id
 
 
 @pytest.mark.usefixtures('outlier_1', 'outlier_2')
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 import pytest
 
 from flask_monitoringdashboard.core.date_interval import DateInterval
+from flask_monitoringdashboard.database import Request
 from flask_monitoringdashboard.database.count import count_requests
 from flask_monitoringdashboard.database.endpoint import get_avg_duration, get_endpoints
 from flask_monitoringdashboard.database.request import add_request, \
@@ -26,7 +27,7 @@ def test_get_latencies_sample(session, request_1, endpoint):
 
 
 def test_add_request(endpoint, session):
-    num_requests = len(endpoint.requests)
+    num_requests = count_requests(session, endpoint.id)
     add_request(
         session,
         duration=200,
@@ -38,6 +39,20 @@ def test_add_request(endpoint, session):
     assert count_requests(session, endpoint.id) == num_requests + 1
 
 
+def test_add_request_time_requested(endpoint, session):
+    before = datetime.utcnow() - timedelta(seconds=1)
+    request_id = add_request(
+        session,
+        duration=200,
+        endpoint_id=endpoint.id,
+        ip='127.0.0.1',
+        group_by=None,
+        status_code=200,
+    )
+    time_requested = session.get(Request, request_id).time_requested
+    assert before <= time_requested <= datetime.utcnow() + timedelta(seconds=1)
+
+
 @pytest.mark.parametrize('request_1__time_requested', [datetime(2020, 2, 3)])
 def test_get_versions(session, request_1):
     for version, first_request in get_versions(session):
@@ -4,6 +4,7 @@ This file contains all unit tests of full stack trace in the database.
 """
 
 import pytest
+from flask_monitoringdashboard.core.exceptions.text_hash import text_hash
 from flask_monitoringdashboard.database import StackTraceSnapshot
 from flask_monitoringdashboard.database.stack_trace_snapshot import (
     get_stack_trace_by_hash,
@@ -14,7 +15,7 @@ from flask_monitoringdashboard.database.stack_trace_snapshot import (
 
 def test_add_stack_trace_snapshot(session):
     stack_trace_snapshot_count = session.query(StackTraceSnapshot).count()
-    hash = "test_hash"
+    hash = text_hash("test")
     stack_trace_snapshot_id = add_stack_trace_snapshot(
         session, hash
     )
@@ -47,7 +48,7 @@ def test_get_stack_trace_by_hash(session, stack_trace_snapshot):
 
 
 def test_get_stack_trace_by_invalid_hash(session):
-    f_stack_trace = get_stack_trace_by_hash(session, "invalid")
+    f_stack_trace = get_stack_trace_by_hash(session, b"invalid")
     assert f_stack_trace is None
 
 